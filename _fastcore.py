@@ -0,0 +1,136 @@
+# cython: language_level=3
+from __future__ import annotations
+
+import sys
+import datetime as _dt
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _cell_to_str(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (_dt.datetime, _dt.date)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _try_to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        s = value.strip()
+        if s == "":
+            return None
+        try:
+            return float(s)
+        except ValueError:
+            return None
+    return None
+
+
+# 单元格取值大量重复（尤其 key 列）；typed=True 避免 1 / 1.0 / True 命中同一缓存项。
+# 只缓存非文本的标量，文本长度不定、命中率低，直接转换
+_cell_to_str_cached = lru_cache(maxsize=65536, typed=True)(_cell_to_str)
+_try_to_float_cached = lru_cache(maxsize=65536, typed=True)(_try_to_float)
+
+
+def _scalar_to_str(v: Any) -> str:
+    if v.__class__ is str:
+        return v.strip()
+    return _cell_to_str_cached(v)
+
+
+def _scalar_to_float(v: Any) -> Optional[float]:
+    if v.__class__ is str:
+        return _try_to_float(v)
+    return _try_to_float_cached(v)
+
+
+def _key_part(v: Any) -> str:
+    t = v.__class__
+    if t is str:
+        return v.strip()
+    if v is None:
+        return ""
+    if t is int:
+        return str(v)
+    return _cell_to_str_cached(v)
+
+
+def _build_key(values: Iterable[Any]) -> str:
+    # 遇到空列立即返回，不再转换后面的列
+    parts: List[str] = []
+    append = parts.append
+    for v in values:
+        s = _key_part(v)
+        if s == "":
+            return ""
+        append(s)
+    return sys.intern("_".join(parts))
+
+
+class _TextAccumulator:
+    __slots__ = ("seen", "parts")
+
+    def __init__(self, first: str):
+        self.seen: Set[str] = set()
+        self.parts: List[str] = []
+        self.add(first)
+
+    def add(self, s: str) -> None:
+        if s == "" or s in self.seen:
+            return
+        self.parts.append(s)
+        for x in s.split(";"):
+            x = x.strip()
+            if x != "":
+                self.seen.add(x)
+
+    def text(self) -> str:
+        return ";".join(self.parts)
+
+
+def _accumulate(prev: Any, cur: Any) -> Any:
+    if prev.__class__ is _TextAccumulator:
+        prev.add(_scalar_to_str(cur))
+        return prev
+    p = _try_to_float(prev)
+    c = _scalar_to_float(cur)
+    if p is not None and c is not None:
+        s = p + c
+        return int(s) if float(s).is_integer() else s
+    prev_s = _cell_to_str(prev)
+    cur_s = _scalar_to_str(cur)
+    if prev_s == "":
+        return cur_s
+    if cur_s == "":
+        return prev_s
+    acc = _TextAccumulator(prev_s)
+    acc.add(cur_s)
+    return acc
+
+
+def _build_mapping(items: Iterable[Tuple[str, Any]], accumulate: bool) -> Dict[str, Any]:
+    mapping: Dict[str, Any] = {}
+    for key, value in items:
+        if not accumulate:
+            if key not in mapping:
+                mapping[key] = value
+            continue
+        prev = mapping.get(key)
+        if prev is None:
+            mapping[key] = value
+            continue
+        mapping[key] = _accumulate(prev, value)
+    if accumulate:
+        for key, v in mapping.items():
+            if v.__class__ is _TextAccumulator:
+                mapping[key] = v.text()
+    return mapping
@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import multiprocessing
 import os
+import re
 import sys
+import threading
 import datetime as _dt
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from xml.etree.ElementTree import iterparse
 
 from openpyxl import load_workbook
+from openpyxl.cell.cell import Cell
+from openpyxl.cell.text import Text
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+from openpyxl.utils.datetime import from_excel, from_ISO8601
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+from openpyxl.worksheet.formula import ArrayFormula
 from openpyxl.worksheet.worksheet import Worksheet
-from PyQt5.QtCore import Qt
+from openpyxl.xml.constants import SHEET_MAIN_NS
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication,
     QFileDialog,
@@ -30,44 +45,118 @@ from PyQt5.QtWidgets import (
     QMessageBox,
 )
 
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
 
-def _cell_to_str(value: Any) -> str:
-    if value is None:
-        return ""
-    if isinstance(value, bool):
-        return "TRUE" if value else "FALSE"
-    if isinstance(value, (_dt.datetime, _dt.date)):
-        return value.isoformat()
-    if isinstance(value, float) and value.is_integer():
-        return str(int(value))
-    return str(value).strip()
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
 
+from _fastcore import _build_key, _build_mapping, _cell_to_str, _key_part
 
-def _try_to_float(value: Any) -> Optional[float]:
-    if value is None:
-        return None
-    if isinstance(value, (int, float)) and not isinstance(value, bool):
-        return float(value)
-    if isinstance(value, str):
-        s = value.strip()
-        if s == "":
-            return None
+
+@dataclass
+class _CachedHeaders:
+    stamp: Tuple[int, int]
+    sheetnames: Tuple[str, ...]
+    headers: Dict[Tuple[str, int], List[str]] = field(default_factory=dict)
+
+
+class _HeaderCache:
+    # 界面操作中同一文件会被反复读取（列 Sheet、切换 Sheet 读表头），按 (路径, 修改时间) 缓存 Sheet 名与表头；
+    # Workbook 读完即关闭，不长期占用文件
+    def __init__(self, maxsize: int = 8):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[str, _CachedHeaders]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fresh(self, path: str, stamp: Tuple[int, int]) -> Optional[_CachedHeaders]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.stamp != stamp:
+                return None
+            self._entries.move_to_end(path)
+            return entry
+
+    def get(self, xlsx_path: str) -> _CachedHeaders:
+        path = os.path.abspath(xlsx_path)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = self._fresh(path, stamp)
+        if entry is not None:
+            return entry
+        # 一次打开就把所有 Sheet 的首行表头读出来，之后切换 Sheet 不再打开文件
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            entry = _CachedHeaders(stamp, tuple(wb.sheetnames))
+            for ws in wb.worksheets:
+                entry.headers[(ws.title, 1)] = _header_names(ws)
+        finally:
+            wb.close()
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def headers(self, xlsx_path: str, sheet_name: str, header_row: int = 1) -> List[str]:
+        entry = self.get(xlsx_path)
+        key = (sheet_name, header_row)
+        with self._lock:
+            names = entry.headers.get(key)
+        if names is None:
+            wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+            try:
+                names = _header_names(wb[sheet_name], header_row=header_row)
+            finally:
+                wb.close()
+            with self._lock:
+                entry.headers[key] = names
+        return list(names)
+
+    def peek_headers(self, xlsx_path: str, sheet_name: str, header_row: int = 1) -> Optional[List[str]]:
+        # 只查缓存、不打开文件；界面据此决定是否需要后台加载
+        path = os.path.abspath(xlsx_path)
         try:
-            return float(s)
-        except ValueError:
+            st = os.stat(path)
+        except OSError:
+            return None
+        entry = self._fresh(path, (st.st_mtime_ns, st.st_size))
+        if entry is None:
             return None
-    return None
+        with self._lock:
+            names = entry.headers.get((sheet_name, header_row))
+        return list(names) if names is not None else None
+
+
+_header_cache = _HeaderCache()
 
 
 def list_sheets(xlsx_path: str) -> List[str]:
-    wb = load_workbook(xlsx_path, data_only=True)
-    return list(wb.sheetnames)
+    return list(_header_cache.get(xlsx_path).sheetnames)
+
+
+def _header_row(ws: Worksheet, header_row: int = 1) -> Tuple[Any, ...]:
+    if not isinstance(ws, ReadOnlyWorksheet):
+        return next(ws.iter_rows(min_row=header_row, max_row=header_row, values_only=True), ())
+    # read_only 会把行截断到 <dimension> 的范围，而该标记可能过期或缺失：清掉后按实际单元格读取表头，
+    # 再按标记的列数补齐（正常文件下与完整加载时的 max_column 一致）。之后该 Sheet 的读取都不再受标记限制
+    width = ws.max_column or 0
+    ws.reset_dimensions()
+    header = tuple(next(ws.iter_rows(min_row=header_row, max_row=header_row, values_only=True), ()))
+    return header + (None,) * (width - len(header))
 
 
 def _header_names(ws: Worksheet, header_row: int = 1) -> List[str]:
+    # 只取表头这一行的值，不构造带样式的 Cell
+    header = _header_row(ws, header_row)
     names: List[str] = []
-    for c in range(1, ws.max_column + 1):
-        name = _cell_to_str(ws.cell(row=header_row, column=c).value)
+    for c, v in enumerate(header, start=1):
+        name = _cell_to_str(v)
         if not name:
             name = f"列{c}"
         names.append(name)
@@ -75,15 +164,17 @@ def _header_names(ws: Worksheet, header_row: int = 1) -> List[str]:
 
 
 def list_columns(xlsx_path: str, sheet_name: str, header_row: int = 1) -> List[str]:
-    wb = load_workbook(xlsx_path, data_only=True)
-    ws = wb[sheet_name]
-    return _header_names(ws, header_row=header_row)
+    return _header_cache.headers(xlsx_path, sheet_name, header_row=header_row)
 
 
 def _get_header_map(ws: Worksheet, header_row: int = 1) -> Dict[str, int]:
+    return _header_map(_header_row(ws, header_row))
+
+
+def _header_map(header: Sequence[Any]) -> Dict[str, int]:
     m: Dict[str, int] = {}
-    for c in range(1, ws.max_column + 1):
-        name = _cell_to_str(ws.cell(row=header_row, column=c).value)
+    for c, v in enumerate(header, start=1):
+        name = _cell_to_str(v)
         if not name:
             name = f"列{c}"
         if name not in m:
@@ -91,47 +182,211 @@ def _get_header_map(ws: Worksheet, header_row: int = 1) -> Dict[str, int]:
     return m
 
 
+_ROW_TAG = f"{{{SHEET_MAIN_NS}}}row"
+_CELL_TAG = f"{{{SHEET_MAIN_NS}}}c"
+_VALUE_TAG = f"{{{SHEET_MAIN_NS}}}v"
+_INLINE_STRING_TAG = f"{{{SHEET_MAIN_NS}}}is"
+_TEXT_TAG = f"{{{SHEET_MAIN_NS}}}t"
+_MERGE_CELL_RE = re.compile(rb"<(?:[\w.-]+:)?mergeCell\s[^>]*?\bref=([\"'])(.*?)\1")
+
+
+def _read_only_merged_ranges(ws: ReadOnlyWorksheet) -> List[Tuple[int, int, int, int]]:
+    # read_only 模式不解析 <mergeCells>；它位于 sheetData 之后，这里只解压扫描字节找到该段再用正则取 ref
+    with ws._get_source() as src:
+        tail = b""
+        while True:
+            chunk = src.read(1 << 20)
+            if not chunk:
+                return []
+            buf = tail + chunk
+            i = buf.find(b"mergeCell")
+            if i >= 0:
+                data = buf[max(0, i - 64):] + src.read()
+                break
+            tail = buf[-64:]
+    ranges: List[Tuple[int, int, int, int]] = []
+    for m in _MERGE_CELL_RE.finditer(data):
+        min_col, min_row, max_col, max_row = range_boundaries(m.group(2).decode())
+        ranges.append((min_row, min_col, max_row, max_col))
+    return ranges
+
+
+def _cast_number(value: str) -> Any:
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _iter_sheet_xml_rows(
+    ws: ReadOnlyWorksheet, min_row: int, cols: Iterable[int], max_row: int = 0
+) -> Iterator[Tuple[int, List[Any]]]:
+    # 直接 iterparse sheet xml，只转换需要的列；取值规则与 openpyxl data_only 解析一致。
+    # 依赖 openpyxl 3.1 的内部属性（_get_source、_shared_strings、_date_formats 等），升级前需核对，见 requirements.txt
+    wanted = set(cols)
+    width = max(wanted)
+    wb = ws.parent
+    shared_strings = ws._shared_strings
+    date_formats = wb._date_formats
+    timedelta_formats = wb._timedelta_formats
+    epoch = wb.epoch
+    row_num = 0
+    col = 0
+    values: Optional[List[Any]] = None
+    next_row = min_row
+    with ws._get_source() as src:
+        for _, elem in iterparse(src):
+            tag = elem.tag
+            if tag == _CELL_TAG:
+                coord = elem.get("r")
+                col = column_index_from_string(coord.rstrip("0123456789")) if coord else col + 1
+                if col not in wanted:
+                    continue
+                t = elem.get("t", "n")
+                value: Any = None
+                if t == "inlineStr":
+                    child = elem.find(_INLINE_STRING_TAG)
+                    if child is not None:
+                        if len(child) == 1 and child[0].tag == _TEXT_TAG:
+                            value = child[0].text or ""
+                        else:
+                            value = Text.from_tree(child).content
+                else:
+                    value = elem.findtext(_VALUE_TAG) or None
+                    if value is None:
+                        pass
+                    elif t == "n":
+                        value = _cast_number(value)
+                        style_id = int(elem.get("s", 0))
+                        if style_id in date_formats:
+                            try:
+                                value = from_excel(value, epoch, timedelta=style_id in timedelta_formats)
+                            except (OverflowError, ValueError):
+                                value = "#VALUE!"
+                    elif t == "s":
+                        value = shared_strings[int(value)]
+                    elif t == "b":
+                        value = bool(int(value))
+                    elif t == "d":
+                        value = from_ISO8601(value)
+                if values is None:
+                    values = [None] * width
+                values[col - 1] = value
+            elif tag == _ROW_TAG:
+                r = elem.get("r")
+                row_num = int(r) if r else row_num + 1
+                if row_num >= min_row:
+                    while next_row < row_num:
+                        yield next_row, [None] * width
+                        next_row += 1
+                    yield row_num, values if values is not None else [None] * width
+                    next_row = row_num + 1
+                values = None
+                col = 0
+                elem.clear()
+    # 结尾按调用方给的 max_row（合并区域的最后一行）补空行，不依赖 <dimension>
+    while next_row <= max_row:
+        yield next_row, [None] * width
+        next_row += 1
+
+
+class _RowSpans:
+    def __init__(self, spans: Iterable[Tuple[int, int]]):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        for start, end in sorted(spans):
+            if self._ends and start <= self._ends[-1] + 1:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __contains__(self, row: int) -> bool:
+        i = bisect_right(self._starts, row) - 1
+        return i >= 0 and row <= self._ends[i]
+
+
 class _MergedValueResolver:
-    def __init__(self, ws: Worksheet):
-        self._lookup: Dict[Tuple[int, int], Tuple[int, int]] = {}
-        for r in ws.merged_cells.ranges:
-            tl = (r.min_row, r.min_col)
-            for row in range(r.min_row, r.max_row + 1):
-                for col in range(r.min_col, r.max_col + 1):
-                    self._lookup[(row, col)] = tl
-
-    def get(self, ws: Worksheet, row: int, col: int) -> Any:
-        tl = self._lookup.get((row, col))
+    def __init__(self, ranges: Iterable[Tuple[int, int, int, int]]):
+        by_col: Dict[int, List[Tuple[int, int, Tuple[int, int]]]] = {}
+        self._anchors: Dict[int, List[int]] = {}
+        self._values: Dict[Tuple[int, int], Any] = {}
+        for min_row, min_col, max_row, max_col in ranges:
+            tl = (min_row, min_col)
+            self._anchors.setdefault(min_row, []).append(min_col)
+            for col in range(min_col, max_col + 1):
+                by_col.setdefault(col, []).append((min_row, max_row, tl))
+        self._cols: Dict[int, List[Tuple[int, int, Tuple[int, int]]]] = {}
+        self._starts: Dict[int, List[int]] = {}
+        for col, spans in by_col.items():
+            spans.sort()
+            self._cols[col] = spans
+            self._starts[col] = [span[0] for span in spans]
+
+    @classmethod
+    def from_worksheet(cls, ws: Worksheet) -> "_MergedValueResolver":
+        ranges = [(r.min_row, r.min_col, r.max_row, r.max_col) for r in ws.merged_cells.ranges]
+        resolver = cls(ranges)
+        for min_row, min_col, _, _ in ranges:
+            resolver._values[(min_row, min_col)] = ws.cell(row=min_row, column=min_col).value
+        return resolver
+
+    def _anchor(self, row: int, col: int) -> Optional[Tuple[int, int]]:
+        starts = self._starts.get(col)
+        if starts is None:
+            return None
+        i = bisect_right(starts, row) - 1
+        if i < 0:
+            return None
+        _, max_row, tl = self._cols[col][i]
+        return tl if row <= max_row else None
+
+    def anchor_cols(self, cols: Iterable[int]) -> Set[int]:
+        return {span[2][1] for c in set(cols) for span in self._cols.get(c, ())}
+
+    def rows(self, cols: Iterable[int]) -> _RowSpans:
+        return _RowSpans((span[0], span[1]) for c in set(cols) for span in self._cols.get(c, ()))
+
+    def feed(self, row: int, values: Sequence[Any], min_col: int = 1) -> None:
+        for col in self._anchors.get(row, ()):
+            i = col - min_col
+            if 0 <= i < len(values):
+                self._values[(row, col)] = values[i]
+
+    def get(self, row: int, col: int, values: Tuple[Any, ...], min_col: int = 1) -> Any:
+        tl = self._anchor(row, col)
         if tl is None:
-            return ws.cell(row=row, column=col).value
-        return ws.cell(row=tl[0], column=tl[1]).value
-
-
-def _build_key(ws: Worksheet, row: int, key_col_indexes: List[int], resolver: _MergedValueResolver) -> str:
-    parts: List[str] = []
-    for c in key_col_indexes:
-        v = resolver.get(ws, row, c)
-        s = _cell_to_str(v)
-        if s == "":
-            return ""
-        parts.append(s)
-    return "_".join(parts)
-
-
-def _accumulate(prev: Any, cur: Any) -> Any:
-    p = _try_to_float(prev)
-    c = _try_to_float(cur)
-    if p is not None and c is not None:
-        s = p + c
-        return int(s) if float(s).is_integer() else s
-    prev_s = _cell_to_str(prev)
-    cur_s = _cell_to_str(cur)
-    if prev_s == "":
-        return cur_s
-    if cur_s == "":
-        return prev_s
-    seen = set([x.strip() for x in prev_s.split(";") if x.strip() != ""])
-    return prev_s if cur_s in seen else (prev_s + ";" + cur_s)
+            i = col - min_col
+            return values[i] if i < len(values) else None
+        return self._values.get(tl)
+
+
+def _make_key_builder(n: int) -> Callable[[Sequence[Any]], str]:
+    part = _key_part
+    intern = sys.intern
+    if n == 1:
+        def build(values: Sequence[Any]) -> str:
+            a = part(values[0])
+            return intern(a) if a else ""
+        return build
+    if n == 2:
+        def build(values: Sequence[Any]) -> str:
+            a = part(values[0])
+            if not a:
+                return ""
+            b = part(values[1])
+            if not b:
+                return ""
+            return intern(f"{a}_{b}")
+        return build
+    return _build_key
+
+
+def _make_row_picker(cols: Sequence[int], min_col: int = 1) -> Callable[[Tuple[Any, ...]], Sequence[Any]]:
+    idx = [c - min_col for c in cols]
+    if len(idx) == 1:
+        i = idx[0]
+        return lambda row: (row[i],)
+    return itemgetter(*idx)
 
 
 @dataclass(frozen=True)
@@ -153,34 +408,116 @@ class TargetConfig:
     header_row: int = 1
 
 
-def build_source_mapping(cfg: SourceConfig) -> Dict[str, Any]:
-    wb = load_workbook(cfg.xlsx_path, data_only=True)
-    ws = wb[cfg.sheet_name]
-    header_map = _get_header_map(ws, header_row=cfg.header_row)
+def _source_items(
+    cfg: SourceConfig,
+    header: Sequence[Any],
+    ranges: List[Tuple[int, int, int, int]],
+    read_rows: Callable[[Set[int]], Iterable[Tuple[int, Sequence[Any]]]],
+) -> Iterator[Tuple[str, Any]]:
+    header_map = _header_map(header)
     missing = [c for c in (*cfg.key_columns, cfg.value_column) if c not in header_map]
     if missing:
         raise ValueError(f"数据源缺少列：{', '.join(missing)}")
-    resolver = _MergedValueResolver(ws)
-    key_col_indexes = [header_map[c] for c in cfg.key_columns]
+    resolver = _MergedValueResolver(ranges)
+    key_col_indexes = tuple(header_map[c] for c in cfg.key_columns)
     value_col_index = header_map[cfg.value_column]
-    mapping: Dict[str, Any] = {}
-    for r in range(cfg.header_row + 1, ws.max_row + 1):
-        key = _build_key(ws, r, key_col_indexes, resolver)
-        if key == "":
-            continue
-        value = resolver.get(ws, r, value_col_index)
-        if value is None or _cell_to_str(value) == "":
+    build = _make_key_builder(len(key_col_indexes))
+    pick = _make_row_picker(key_col_indexes)
+    merged_rows = resolver.rows(key_col_indexes)
+    cols = {*key_col_indexes, value_col_index, *resolver.anchor_cols((*key_col_indexes, value_col_index))}
+    # read_rows 从第 1 行开始：表头及其上方的行只用来记录合并区域的左上角值（合并区域可能从表头开始）
+    for r, row in read_rows(cols):
+        resolver.feed(r, row)
+        if r <= cfg.header_row:
             continue
-        if not cfg.accumulate:
-            if key not in mapping:
-                mapping[key] = value
+        if r in merged_rows:
+            key = build([resolver.get(r, c, row) for c in key_col_indexes])
+        else:
+            key = build(pick(row))
+        if key == "":
             continue
-        prev = mapping.get(key)
-        if prev is None:
-            mapping[key] = value
+        value = resolver.get(r, value_col_index, row)
+        if value is None or _key_part(value) == "":
             continue
-        mapping[key] = _accumulate(prev, value)
-    return mapping
+        yield key, value
+
+
+def _iter_openpyxl_source_items(cfg: SourceConfig) -> Iterator[Tuple[str, Any]]:
+    wb = load_workbook(cfg.xlsx_path, read_only=True, data_only=True)
+    try:
+        ws = wb[cfg.sheet_name]
+        header = _header_row(ws, cfg.header_row)
+        ranges = _read_only_merged_ranges(ws)
+        last_row = max((max_row for _, _, max_row, _ in ranges), default=0)
+        yield from _source_items(
+            cfg, header, ranges, lambda cols: _iter_sheet_xml_rows(ws, 1, cols, last_row)
+        )
+    finally:
+        wb.close()
+
+
+def _calamine_value(v: Any) -> Any:
+    # 与 openpyxl 的取值保持一致：空单元格为 None、整数不带小数、日期统一为 datetime
+    t = v.__class__
+    if t is str:
+        return v if v != "" else None
+    if t is float:
+        return int(v) if v.is_integer() and abs(v) < 2**53 else v
+    if t is _dt.date:
+        return _dt.datetime(v.year, v.month, v.day)
+    return v
+
+
+def _iter_calamine_rows(
+    rows: List[List[Any]], min_row: int, max_row: int, cols: Set[int]
+) -> Iterator[Tuple[int, List[Any]]]:
+    width = max(cols)
+    idx = [c - 1 for c in cols]
+    for r in range(min_row, max_row + 1):
+        src = rows[r - 1] if r <= len(rows) else ()
+        n = len(src)
+        out: List[Any] = [None] * width
+        for i in idx:
+            if i < n:
+                out[i] = _calamine_value(src[i])
+        yield r, out
+
+
+def _read_calamine_sheet(cfg: SourceConfig) -> Optional[Tuple[List[List[Any]], List[Tuple[int, int, int, int]]]]:
+    try:
+        wb = CalamineWorkbook.from_path(cfg.xlsx_path)
+        try:
+            sheet = wb.get_sheet_by_name(cfg.sheet_name)
+            rows = sheet.to_python(skip_empty_area=False)
+            merged = sheet.merged_cell_ranges or ()
+        finally:
+            wb.close()
+    except Exception:
+        # calamine 读不了的文件交给 openpyxl，由它给出原有的报错
+        return None
+    ranges = [(r0 + 1, c0 + 1, r1 + 1, c1 + 1) for (r0, c0), (r1, c1) in merged]
+    return rows, ranges
+
+
+def _iter_source_items(cfg: SourceConfig, fast_read: bool = False) -> Iterator[Tuple[str, Any]]:
+    # fast_read 时用 python-calamine 读取（Rust 实现，解压与解析都快得多）；
+    # calamine 会把错误值单元格（#N/A 等）读成空值，结果可能与 openpyxl 不同，所以只在显式要求时使用
+    sheet = _read_calamine_sheet(cfg) if fast_read and CalamineWorkbook is not None else None
+    if sheet is None:
+        yield from _iter_openpyxl_source_items(cfg)
+        return
+    rows, ranges = sheet
+    header = [_calamine_value(v) for v in rows[cfg.header_row - 1]] if len(rows) >= cfg.header_row else []
+    # calamine 的行宽只算有值的列；只有合并区域的列也要出现在表头里，与 openpyxl 读取的列一致
+    width = max((max_col for _, _, _, max_col in ranges), default=0)
+    header += [None] * (width - len(header))
+    # 合并区域可能超出 calamine 的数据范围，按合并区域补齐行
+    max_row = max([len(rows), *(max_row for _, _, max_row, _ in ranges)])
+    yield from _source_items(cfg, header, ranges, lambda cols: _iter_calamine_rows(rows, 1, max_row, cols))
+
+
+def build_source_mapping(cfg: SourceConfig, fast_read: bool = False) -> Dict[str, Any]:
+    return _build_mapping(_iter_source_items(cfg, fast_read), cfg.accumulate)
 
 
 def _ensure_dir(p: str) -> None:
@@ -189,15 +526,121 @@ def _ensure_dir(p: str) -> None:
         os.makedirs(d, exist_ok=True)
 
 
+def _resolve_output_path(tgt_cfg: TargetConfig, output_path: Optional[str]) -> str:
+    if not output_path or output_path.strip() == "":
+        src = Path(tgt_cfg.xlsx_path)
+        output_path = str(src.with_name(f"{src.stem}_matched{src.suffix}"))
+    _ensure_dir(output_path)
+    return output_path
+
+
+_PARALLEL_SCAN_MIN_BYTES = 1 << 20
+
+
+def _group_rows_by_key(
+    rows: Iterable[Tuple[int, Sequence[Any]]],
+    resolver: _MergedValueResolver,
+    key_col_indexes: Tuple[int, ...],
+    min_col: int = 1,
+    min_row: int = 1,
+) -> Tuple[Dict[str, List[int]], int]:
+    build = _make_key_builder(len(key_col_indexes))
+    pick = _make_row_picker(key_col_indexes, min_col)
+    merged_rows = resolver.rows(key_col_indexes)
+    width = max(key_col_indexes) - min_col + 1
+    rows_by_key: Dict[str, List[int]] = {}
+    total = 0
+    for r, row in rows:
+        # 没有 <dimension> 时只读模式的行不补齐，短行按空值补到 key 列
+        if len(row) < width:
+            row = (*row, *(None,) * (width - len(row)))
+        resolver.feed(r, row, min_col)
+        # min_row 之前的行（表头及其上方）只记录合并区域的左上角值
+        if r < min_row:
+            continue
+        if r in merged_rows:
+            key = build([resolver.get(r, c, row, min_col) for c in key_col_indexes])
+        else:
+            key = build(pick(row))
+        if key == "":
+            continue
+        total += 1
+        key_rows = rows_by_key.get(key)
+        if key_rows is None:
+            rows_by_key[key] = [r]
+        else:
+            key_rows.append(r)
+    return rows_by_key, total
+
+
+def _number_rows(
+    rows: Iterable[Sequence[Any]], start: int, ranges: List[Tuple[int, int, int, int]]
+) -> Iterator[Tuple[int, Sequence[Any]]]:
+    # 完整加载时合并区域内的单元格都会计入行数；只读模式下它们可能不在 xml 里，按合并区域补出空行
+    r = start - 1
+    for r, row in enumerate(rows, start=start):
+        yield r, row
+    last = max((max_row for _, _, max_row, _ in ranges), default=0)
+    for r in range(max(r + 1, start), last + 1):
+        yield r, ()
+
+
+def _scan_target_keys(tgt_cfg: TargetConfig) -> Tuple[Dict[str, List[int]], int]:
+    wb = load_workbook(tgt_cfg.xlsx_path, read_only=True)
+    try:
+        ws = wb[tgt_cfg.sheet_name]
+        # 主进程做完整加载、不看 <dimension>；这里也不能信它，否则结果会随文件大小（是否并行）而变。
+        # _get_header_map 读表头时会清掉该标记，后面的 iter_rows 按实际单元格读取
+        header_map = _get_header_map(ws, header_row=tgt_cfg.header_row)
+        key_col_indexes = tuple(header_map[c] for c in tgt_cfg.key_columns)
+        ranges = _read_only_merged_ranges(ws)
+        # 从第 1 行读起，表头所在行开始的合并区域也能取到左上角值
+        rows = ws.iter_rows(max_col=max(key_col_indexes), values_only=True)
+        return _group_rows_by_key(
+            _number_rows(rows, 1, ranges),
+            _MergedValueResolver(ranges),
+            key_col_indexes,
+            min_row=tgt_cfg.header_row + 1,
+        )
+    finally:
+        wb.close()
+
+
 def apply_mapping_to_target(
     src_cfg: SourceConfig,
     mapping: Dict[str, Any],
     tgt_cfg: TargetConfig,
     output_path: Optional[str] = None,
     output_header: Optional[str] = None,
+    preserve_styles: bool = True,
+) -> Tuple[int, int, str]:
+    if not preserve_styles and xlsxwriter is not None:
+        return _apply_mapping_values_only(src_cfg, mapping, tgt_cfg, output_path, output_header)
+    # 大文件时 key 扫描放到子进程（read_only 重新打开），与主进程完整加载工作簿并行
+    pool: Optional[ProcessPoolExecutor] = None
+    scan = None
+    if (os.cpu_count() or 1) > 1 and os.path.getsize(tgt_cfg.xlsx_path) >= _PARALLEL_SCAN_MIN_BYTES:
+        pool = ProcessPoolExecutor(max_workers=1)
+        scan = pool.submit(_scan_target_keys, tgt_cfg)
+    try:
+        return _apply_mapping(src_cfg, mapping, tgt_cfg, scan, output_path, output_header)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _apply_mapping(
+    src_cfg: SourceConfig,
+    mapping: Dict[str, Any],
+    tgt_cfg: TargetConfig,
+    scan: Optional[Future],
+    output_path: Optional[str],
+    output_header: Optional[str],
 ) -> Tuple[int, int, str]:
     wb = load_workbook(tgt_cfg.xlsx_path)
     ws = wb[tgt_cfg.sheet_name]
+    # 非只读模式下 max_row / max_column 每次访问都要遍历全部单元格，只取一次
+    max_row, max_col = ws.max_row, ws.max_column
     header_map = _get_header_map(ws, header_row=tgt_cfg.header_row)
     write_col_index: Optional[int] = None
     if tgt_cfg.write_to_column:
@@ -205,33 +648,201 @@ def apply_mapping_to_target(
             raise KeyError(f"匹配写入列不存在：{tgt_cfg.write_to_column}")
         write_col_index = header_map[tgt_cfg.write_to_column]
     else:
-        write_col_index = ws.max_column + 1
+        write_col_index = max_col + 1
         hdr = output_header if output_header and output_header.strip() else f"匹配_{src_cfg.value_column}"
         ws.cell(row=tgt_cfg.header_row, column=write_col_index).value = hdr
-    resolver = _MergedValueResolver(ws)
-    key_col_indexes = [header_map[c] for c in tgt_cfg.key_columns]
+    if scan is not None:
+        rows_by_key, total = scan.result()
+    else:
+        key_col_indexes = tuple(header_map[c] for c in tgt_cfg.key_columns)
+        min_col = min(key_col_indexes)
+        rows = ws.iter_rows(
+            min_row=tgt_cfg.header_row + 1,
+            max_row=max_row,
+            min_col=min_col,
+            max_col=max(key_col_indexes),
+            values_only=True,
+        )
+        rows_by_key, total = _group_rows_by_key(
+            enumerate(rows, start=tgt_cfg.header_row + 1),
+            _MergedValueResolver.from_worksheet(ws),
+            key_col_indexes,
+            min_col,
+        )
+    cells = ws._cells
+    col = write_col_index
     matched = 0
-    total = 0
-    for r in range(tgt_cfg.header_row + 1, ws.max_row + 1):
-        key = _build_key(ws, r, key_col_indexes, resolver)
-        if key == "":
-            continue
-        total += 1
+    for key, key_rows in rows_by_key.items():
         v = mapping.get(key)
-        if v is not None:
-            ws.cell(row=r, column=write_col_index).value = v
-            matched += 1
-    if not output_path or output_path.strip() == "":
-        src = Path(tgt_cfg.xlsx_path)
-        output_path = str(src.with_name(f"{src.stem}_matched{src.suffix}"))
-    _ensure_dir(output_path)
+        if v is None:
+            continue
+        matched += len(key_rows)
+        for r in key_rows:
+            cell = cells.get((r, col))
+            if cell is None:
+                cells[(r, col)] = Cell(ws, r, col, v)
+            else:
+                cell.value = v
+    output_path = _resolve_output_path(tgt_cfg, output_path)
     wb.save(output_path)
     return matched, total, output_path
 
 
+def _excel_formats(out: Any) -> Dict[type, Any]:
+    return {
+        _dt.datetime: out.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"}),
+        _dt.date: out.add_format({"num_format": "yyyy-mm-dd"}),
+        _dt.time: out.add_format({"num_format": "hh:mm:ss"}),
+        _dt.timedelta: out.add_format({"num_format": "[h]:mm:ss"}),
+    }
+
+
+def _write_value(out_ws: Any, row: int, col: int, v: Any, formats: Dict[type, Any]) -> None:
+    if v is None:
+        return
+    fmt = formats.get(v.__class__)
+    if fmt is None:
+        out_ws.write(row - 1, col - 1, v)
+        return
+    if v.__class__ is _dt.datetime and v.time() == _dt.time():
+        fmt = formats[_dt.date]
+    out_ws.write_datetime(row - 1, col - 1, v, fmt)
+
+
+def _write_cell(out_ws: Any, row: int, col: int, cell: Any, formats: Dict[type, Any]) -> None:
+    # 只有公式单元格才按公式写出；以 "=" 开头的文本仍是文本
+    v = cell.value
+    if v is None:
+        return
+    if cell.data_type == "f":
+        if v.__class__ is ArrayFormula:
+            min_col, min_row, max_col, max_row = range_boundaries(v.ref)
+            out_ws.write_array_formula(min_row - 1, min_col - 1, max_row - 1, max_col - 1, v.text)
+        else:
+            out_ws.write_formula(row - 1, col - 1, v)
+        return
+    _write_value(out_ws, row, col, v, formats)
+
+
+def _copy_sheet_values(
+    ws: ReadOnlyWorksheet,
+    out_ws: Any,
+    formats: Dict[type, Any],
+    ranges: List[Tuple[int, int, int, int]],
+    stats: Dict[str, int],
+) -> Iterator[Tuple[int, Tuple[Any, ...]]]:
+    anchor_cols: Dict[int, List[int]] = {}
+    for min_row, min_col, _, _ in ranges:
+        anchor_cols.setdefault(min_row, []).append(min_col)
+    anchors: Dict[Tuple[int, int], Any] = {}
+    width = max((max_col for _, _, _, max_col in ranges), default=0)
+    for r, cells in _number_rows(ws.iter_rows(), 1, ranges):
+        n = len(cells)
+        if n > width:
+            width = n
+        for c, cell in enumerate(cells, start=1):
+            _write_cell(out_ws, r, c, cell, formats)
+        cols = anchor_cols.get(r)
+        if cols is not None:
+            for c in cols:
+                if c <= n:
+                    anchors[(r, c)] = cells[c - 1]
+        yield r, tuple(cell.value for cell in cells)
+    stats["max_column"] = width
+    for min_row, min_col, max_row, max_col in ranges:
+        if (min_row, min_col) == (max_row, max_col):
+            continue
+        out_ws.merge_range(min_row - 1, min_col - 1, max_row - 1, max_col - 1, None)
+        anchor = anchors.get((min_row, min_col))
+        if anchor is not None:
+            _write_cell(out_ws, min_row, min_col, anchor, formats)
+
+
+def _apply_mapping_values_only(
+    src_cfg: SourceConfig,
+    mapping: Dict[str, Any],
+    tgt_cfg: TargetConfig,
+    output_path: Optional[str],
+    output_header: Optional[str],
+) -> Tuple[int, int, str]:
+    # 不保留格式的快速输出：read_only 流式读取 + xlsxwriter 写出，只保留值、公式与合并区域
+    output_path = _resolve_output_path(tgt_cfg, output_path)
+    wb = load_workbook(tgt_cfg.xlsx_path, read_only=True)
+    try:
+        ws = wb[tgt_cfg.sheet_name]
+        header_map = _get_header_map(ws, header_row=tgt_cfg.header_row)
+        # <dimension> 可能过期或缺失，按它截断会丢行丢列；所有 Sheet 都按实际单元格读取
+        for sheet in wb.worksheets:
+            if isinstance(sheet, ReadOnlyWorksheet):
+                sheet.reset_dimensions()
+        if tgt_cfg.write_to_column and tgt_cfg.write_to_column not in header_map:
+            raise KeyError(f"匹配写入列不存在：{tgt_cfg.write_to_column}")
+        key_col_indexes = tuple(header_map[c] for c in tgt_cfg.key_columns)
+        out = xlsxwriter.Workbook(output_path, {"strings_to_formulas": False, "strings_to_urls": False, "nan_inf_to_errors": True})
+        try:
+            formats = _excel_formats(out)
+            rows_by_key: Dict[str, List[int]] = {}
+            total = 0
+            for sheet in wb.worksheets:
+                if not isinstance(sheet, ReadOnlyWorksheet):
+                    continue
+                out_ws = out.add_worksheet(sheet.title)
+                stats: Dict[str, int] = {}
+                ranges = _read_only_merged_ranges(sheet)
+                rows = _copy_sheet_values(sheet, out_ws, formats, ranges, stats)
+                if sheet is not ws:
+                    for _ in rows:
+                        pass
+                    continue
+                target_ws = out_ws
+                rows_by_key, total = _group_rows_by_key(
+                    rows, _MergedValueResolver(ranges), key_col_indexes, min_row=tgt_cfg.header_row + 1
+                )
+                target_stats = stats
+            if tgt_cfg.write_to_column:
+                col = header_map[tgt_cfg.write_to_column]
+            else:
+                col = target_stats["max_column"] + 1
+                hdr = output_header if output_header and output_header.strip() else f"匹配_{src_cfg.value_column}"
+                _write_value(target_ws, tgt_cfg.header_row, col, hdr, formats)
+            matched = 0
+            for key, key_rows in rows_by_key.items():
+                v = mapping.get(key)
+                if v is None:
+                    continue
+                matched += len(key_rows)
+                for r in key_rows:
+                    _write_value(target_ws, r, col, v, formats)
+        finally:
+            out.close()
+    finally:
+        wb.close()
+    return matched, total, output_path
+
+
+class _HeaderLoader(QThread):
+    # 在后台线程读取表头，避免大文件阻塞界面
+    loaded = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, path: str, sheet: str, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.path = path
+        self.sheet = sheet
+
+    def run(self) -> None:
+        try:
+            cols = list_columns(self.path, self.sheet)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(cols)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self._loaders: Dict[str, _HeaderLoader] = {}
         self.setWindowTitle("合并单元格匹配工具")
         cw = QWidget()
         self.setCentralWidget(cw)
@@ -275,6 +886,11 @@ class MainWindow(QMainWindow):
         src_value_row.addWidget(self.src_value, 1)
         src_value_row.addWidget(self.src_acc)
         src_layout.addRow(QLabel("Value 列"), src_value_row)
+        self.src_fast = QCheckBox("快速读取（错误值单元格按空值处理）")
+        self.src_fast.setEnabled(CalamineWorkbook is not None)
+        if CalamineWorkbook is None:
+            self.src_fast.setToolTip("需要安装 python-calamine")
+        src_layout.addRow(QLabel(""), self.src_fast)
         self.tgt_path = QLineEdit()
         self.tgt_browse = QPushButton("选择Excel")
         tgt_path_row = QHBoxLayout()
@@ -303,6 +919,11 @@ class MainWindow(QMainWindow):
         out_path_row.addWidget(self.out_path, 1)
         out_path_row.addWidget(self.out_browse)
         out_layout.addRow(QLabel("输出文件"), out_path_row)
+        self.out_fast = QCheckBox("快速输出（不保留格式）")
+        self.out_fast.setEnabled(xlsxwriter is not None)
+        if xlsxwriter is None:
+            self.out_fast.setToolTip("需要安装 xlsxwriter")
+        out_layout.addRow(QLabel(""), self.out_fast)
         self.run_btn = QPushButton("开始匹配")
         root.addWidget(self.run_btn)
         self.src_browse.clicked.connect(self._on_src_browse)
@@ -316,6 +937,12 @@ class MainWindow(QMainWindow):
         btn_tgt_clear.clicked.connect(lambda: self._select_all(self.tgt_keys, False))
         self.run_btn.clicked.connect(self._on_run)
 
+    def closeEvent(self, event) -> None:
+        # 后台读取表头的线程结束前不能销毁窗口
+        for loader in self.findChildren(_HeaderLoader):
+            loader.wait()
+        super().closeEvent(event)
+
     def _select_all(self, lw: QListWidget, sel: bool) -> None:
         for i in range(lw.count()):
             it = lw.item(i)
@@ -358,18 +985,46 @@ class MainWindow(QMainWindow):
             combo.addItem(s)
         combo.blockSignals(False)
 
+    def _load_columns(self, side: str, path: str, sheet: str, lw: QListWidget, fill: Callable[[List[str]], None]) -> None:
+        cols = _header_cache.peek_headers(path, sheet)
+        if cols is not None:
+            fill(cols)
+            return
+        placeholder = QListWidgetItem("加载中…")
+        placeholder.setFlags(Qt.NoItemFlags)
+        lw.addItem(placeholder)
+        loader = _HeaderLoader(path, sheet, self)
+        self._loaders[side] = loader
+
+        def on_loaded(cols: List[str]) -> None:
+            if self._loaders.get(side) is loader:
+                del self._loaders[side]
+                fill(cols)
+
+        def on_failed(msg: str) -> None:
+            if self._loaders.get(side) is loader:
+                del self._loaders[side]
+                lw.clear()
+                QMessageBox.critical(self, "错误", msg)
+
+        loader.loaded.connect(on_loaded)
+        loader.failed.connect(on_failed)
+        loader.finished.connect(loader.deleteLater)
+        loader.start()
+
     def _refresh_src_columns(self) -> None:
         path = self.src_path.text().strip()
         sheet = self.src_sheet.currentText().strip()
         self.src_keys.clear()
         self.src_value.clear()
+        self._loaders.pop("src", None)
         if not path or not sheet:
             return
-        try:
-            cols = list_columns(path, sheet)
-        except Exception as e:
-            QMessageBox.critical(self, "错误", str(e))
-            return
+        self._load_columns("src", path, sheet, self.src_keys, self._fill_src_columns)
+
+    def _fill_src_columns(self, cols: List[str]) -> None:
+        self.src_keys.clear()
+        self.src_value.clear()
         for c in cols:
             it = QListWidgetItem(c)
             self.src_keys.addItem(it)
@@ -380,13 +1035,14 @@ class MainWindow(QMainWindow):
         sheet = self.tgt_sheet.currentText().strip()
         self.tgt_keys.clear()
         self.tgt_write_col.clear()
+        self._loaders.pop("tgt", None)
         if not path or not sheet:
             return
-        try:
-            cols = list_columns(path, sheet)
-        except Exception as e:
-            QMessageBox.critical(self, "错误", str(e))
-            return
+        self._load_columns("tgt", path, sheet, self.tgt_keys, self._fill_tgt_columns)
+
+    def _fill_tgt_columns(self, cols: List[str]) -> None:
+        self.tgt_keys.clear()
+        self.tgt_write_col.clear()
         for c in cols:
             it = QListWidgetItem(c)
             self.tgt_keys.addItem(it)
@@ -425,7 +1081,7 @@ class MainWindow(QMainWindow):
                 value_column=val_col,
                 accumulate=acc,
             )
-            mapping = build_source_mapping(src_cfg)
+            mapping = build_source_mapping(src_cfg, fast_read=self.src_fast.isChecked())
             write_to = self.tgt_write_col.currentText().strip()
             if write_to == "新增到最后一列":
                 write_to = None
@@ -442,6 +1098,7 @@ class MainWindow(QMainWindow):
                 tgt_cfg=tgt_cfg,
                 output_path=out_path,
                 output_header=None,
+                preserve_styles=not self.out_fast.isChecked(),
             )
             QMessageBox.information(self, "完成", f"匹配成功：{matched}/{total}\n输出文件：{out_file}")
         except Exception as e:
@@ -449,6 +1106,7 @@ class MainWindow(QMainWindow):
 
 
 def main() -> None:
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     w = MainWindow()
     w.resize(900, 700)
@@ -0,0 +1,9 @@
+from setuptools import setup
+from Cython.Build import cythonize
+
+# 可选：把 _fastcore.py 编译为扩展模块（python setup.py build_ext --inplace），
+# 编译产物与 .py 同目录时会被优先导入；未编译时直接使用纯 Python 版本。
+setup(
+    name="merge-cells-excel-matching-fastcore",
+    ext_modules=cythonize(["_fastcore.py"], language_level=3),
+)